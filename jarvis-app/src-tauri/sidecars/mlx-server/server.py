@@ -7,61 +7,422 @@ Communicates via NDJSON over stdin/stdout.
 
 import sys
 import json
+import math
+import os
 import platform
 import re
+import selectors
+import struct
+import threading
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
 
+# orjson (C extension) parses and encodes JSON several times faster than
+# stdlib json and allocates less — worthwhile on the per-message NDJSON
+# hot path. Optional: fall back to stdlib when not installed.
+try:
+    import orjson
+
+    _dumps_bytes = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps_bytes(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+
+# Serializes frame writes: the download worker thread emits progress while
+# the main loop emits responses, and interleaved partial frames would
+# corrupt the NDJSON stream.
+_emit_lock = threading.Lock()
+
+# Reusable frame buffer, guarded by the same lock. Assembling the frame
+# here means one write syscall per frame and no fresh concatenation
+# allocation per message — noticeable during download progress bursts.
+_out_buf = bytearray()
+
+
+# Set by --binary-frames at startup; frames become u32_le length-prefixed
+# msgpack instead of newline-delimited JSON
+_binary_frames = False
+
+
+def _emit(obj) -> None:
+    """Serialize and write one output frame to stdout.
+
+    Default is one NDJSON line per frame; orjson produces bytes, so writing
+    to the underlying buffer skips the text-mode encode that print would do.
+    With --binary-frames each frame is msgpack prefixed with its u32_le
+    length — O(1) boundary detection for the parent instead of a newline
+    scan, which matters for high-rate progress frames. Flushes per frame —
+    the parent process waits on complete frames.
+    """
+    global _out_buf
+    with _emit_lock:
+        _out_buf.clear()
+        if _binary_frames:
+            payload = msgpack.packb(obj)
+            _out_buf += struct.pack("<I", len(payload))
+            _out_buf += payload
+        else:
+            _out_buf += _dumps_bytes(obj)
+            _out_buf += b"\n"
+        sys.stdout.buffer.write(_out_buf)
+        sys.stdout.buffer.flush()
+
+
+def _enable_binary_frames() -> None:
+    """Switch _emit to the length-prefixed msgpack protocol, if msgpack is
+    installed; otherwise warn and stay on NDJSON so the parent still gets
+    parseable frames."""
+    global _binary_frames
+    try:
+        import msgpack as _msgpack  # noqa: F401
+    except ImportError:
+        print("MLX: --binary-frames requested but msgpack not installed; "
+              "falling back to NDJSON", file=sys.stderr, flush=True)
+        return
+    globals()["msgpack"] = _msgpack
+    _binary_frames = True
+
+
+# Opt-in binary framing must be decided before the first frame (the
+# platform check below can emit)
+if "--binary-frames" in sys.argv[1:]:
+    _enable_binary_frames()
+
 # Check platform
 if platform.machine() != "arm64":
-    print(json.dumps({
+    _emit({
         "type": "error",
         "error": "MLX requires Apple Silicon (arm64)"
-    }), file=sys.stdout, flush=True)
+    })
     sys.exit(1)
 
+# Raise scheduling priority so macOS keeps the sidecar on performance
+# cores during generation instead of migrating it to efficiency cores.
+# Needs elevated privileges on some setups — best-effort.
 try:
+    os.setpriority(os.PRIO_PROCESS, 0, -5)
+except (OSError, AttributeError):
+    pass
+
+# Heavy dependencies (numpy, MLX Metal kernels, mlx-lm, huggingface_hub's
+# HTTP stack) each cost hundreds of ms to import. They are loaded on first
+# use via _ensure_mlx / _ensure_hub instead of at module load, so a sidecar
+# that only answers check-availability + shutdown never pays for them and
+# the parent sees the first response tens of ms sooner.
+np = None
+mx = None
+load = None
+mlx_lm_generate = None
+mlx_lm_stream_generate = None
+make_logits_processors = None
+make_sampler = None
+make_prompt_cache = None
+trim_prompt_cache = None
+can_trim_prompt_cache = None
+mlx_omni_load = None
+mlx_omni_generate = None
+OMNI_AVAILABLE = False
+sf = None
+snapshot_download = None
+_GREEDY_SAMPLER = None
+_MLX_READY = False
+
+
+def _ensure_mlx() -> None:
+    """Import the MLX stack on first use and wire compat shims.
+
+    Populates the module globals declared above, so existing call sites
+    resolve them normally afterwards. Raises ImportError when the stack is
+    missing; callers (check_availability, load_model) already surface that
+    as an error response.
+    """
+    global np, mx, load, mlx_lm_generate, mlx_lm_stream_generate, \
+        make_logits_processors, make_sampler, make_prompt_cache, \
+        trim_prompt_cache, can_trim_prompt_cache, mlx_omni_load, \
+        mlx_omni_generate, OMNI_AVAILABLE, sf, _GREEDY_SAMPLER, _MLX_READY
+    if _MLX_READY:
+        return
+
+    import numpy as np
     import mlx.core as mx
     from mlx_lm import load
     from mlx_lm import generate as mlx_lm_generate
+    from mlx_lm import stream_generate as mlx_lm_stream_generate
+    from mlx_lm.sample_utils import make_logits_processors, make_sampler
+    from mlx_lm.models.cache import make_prompt_cache, trim_prompt_cache, can_trim_prompt_cache
+
+    # Compatibility shim: mlx-lm >= 0.30 renamed get_model_path -> hf_repo_to_path
+    # mlx-lm-omni 0.1.3 imports get_model_path, so we provide it before importing mlx_lm_omni.
+    # We also add local path support since hf_repo_to_path only handles HF repo IDs.
+    from pathlib import Path as _Path
+    import mlx_lm.utils as _mlx_lm_utils
+    if not hasattr(_mlx_lm_utils, 'get_model_path'):
+        _original_hf_fn = getattr(_mlx_lm_utils, 'hf_repo_to_path', None)
+        def _get_model_path(path_or_hf_repo: str) -> _Path:
+            # Local directory path — return directly
+            if os.path.isdir(path_or_hf_repo):
+                return _Path(path_or_hf_repo)
+            # HF repo ID — resolve via snapshot_download
+            if _original_hf_fn:
+                return _original_hf_fn(path_or_hf_repo)
+            raise ValueError(f"Path not found and no HF resolver available: {path_or_hf_repo}")
+        _mlx_lm_utils.get_model_path = _get_model_path
+
+    # Greedy sampler for deterministic tasks (tag extraction, summarization).
+    # Argmax skips the per-token softmax + multinomial sampling kernels.
+    _GREEDY_SAMPLER = make_sampler(temp=0.0)
+
+    # Optional multimodal support — mlx_lm.load/generate do NOT support
+    # multimodal architectures; those need mlx_lm_omni.load/generate.
+    try:
+        from mlx_lm_omni import load as mlx_omni_load
+        from mlx_lm_omni import generate as mlx_omni_generate
+        OMNI_AVAILABLE = True
+    except ImportError:
+        OMNI_AVAILABLE = False
+
+    # Audio decoding, only needed for multimodal models
+    try:
+        import soundfile as sf
+    except ImportError:
+        sf = None
+
+    _MLX_READY = True
+
+
+def _ensure_hub() -> None:
+    """Import huggingface_hub on first use (download commands only)."""
+    global snapshot_download
+    if snapshot_download is not None:
+        return
+    # Prefer the Rust-based hf_transfer downloader when installed — roughly
+    # halves wall-clock time on multi-GB model downloads. Must be decided
+    # before huggingface_hub is imported: it reads the env var at import time.
+    try:
+        import hf_transfer  # noqa: F401
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+    except ImportError:
+        pass
     from huggingface_hub import snapshot_download
-except ImportError as e:
-    print(json.dumps({
-        "type": "error",
-        "error": f"Failed to import MLX dependencies: {str(e)}"
-    }), file=sys.stdout, flush=True)
-    sys.exit(1)
 
-# Compatibility shim: mlx-lm >= 0.30 renamed get_model_path -> hf_repo_to_path
-# mlx-lm-omni 0.1.3 imports get_model_path, so we provide it before importing mlx_lm_omni.
-# We also add local path support since hf_repo_to_path only handles HF repo IDs.
-import os
-from pathlib import Path as _Path
-import mlx_lm.utils as _mlx_lm_utils
-if not hasattr(_mlx_lm_utils, 'get_model_path'):
-    _original_hf_fn = getattr(_mlx_lm_utils, 'hf_repo_to_path', None)
-    def _get_model_path(path_or_hf_repo: str) -> _Path:
-        # Local directory path — return directly
-        if os.path.isdir(path_or_hf_repo):
-            return _Path(path_or_hf_repo)
-        # HF repo ID — resolve via snapshot_download
-        if _original_hf_fn:
-            return _original_hf_fn(path_or_hf_repo)
-        raise ValueError(f"Path not found and no HF resolver available: {path_or_hf_repo}")
-    _mlx_lm_utils.get_model_path = _get_model_path
-
-# Try to import mlx_lm_omni for multimodal support
-# This is optional - only needed when using multimodal models
-# IMPORTANT: mlx_lm.load/generate do NOT support multimodal architectures
-# We must use mlx_lm_omni.load for loading and mlx_lm_omni.generate for inference
+# Precompiled patterns for _parse_tags (hot path on every generate-tags call).
+# The translate table folds newline→comma normalization together with
+# bracket/quote removal, so the fallback is one C-level pass plus one split.
+_TAG_ARRAY_RE = re.compile(r'\[.*?\]', re.DOTALL)
+_TAG_CLEAN_TABLE = str.maketrans({'[': None, ']': None, '"': None, "'": None, '\n': ','})
+
+# Markdown code fence wrapping model JSON output; it only appears at the
+# boundaries, so one anchored match beats the split/filter/join approach.
+# The closing fence is optional: early-stopped streams end at the JSON brace.
+_FENCE_RE = re.compile(r'\A```[^\n]*\n(.*?)(?:\n```\s*)?\Z', re.DOTALL)
+
+
+def _strip_code_fence(text: str) -> str:
+    """Strip a markdown code fence wrapping the whole text, if present."""
+    match = _FENCE_RE.match(text)
+    return match.group(1).strip() if match else text
+
+
+def _scan_json_state(text: str):
+    """Walk JSON text and return (open-container stack, inside-string flag).
+
+    The stack holds the closing character for each container still open at
+    the end of the text, in opening order. Stops early on a structurally
+    impossible closer so garbage past that point is ignored.
+    """
+    stack = []
+    in_string = False
+    escape = False
+    for ch in text:
+        if escape:
+            escape = False
+        elif in_string:
+            if ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            stack.append('}')
+        elif ch == '[':
+            stack.append(']')
+        elif ch in '}]':
+            if not stack or stack[-1] != ch:
+                break
+            stack.pop()
+    return stack, in_string
+
+
+def _complete_partial_json(text: str) -> Optional[Dict[str, Any]]:
+    """Recover an object from JSON truncated mid-generation.
+
+    Closes any string and containers left open at the cut point and tries
+    to parse; if the tail is an incomplete scalar (e.g. ``"key": tru``),
+    retreats to the previous comma and tries again. Returns None when no
+    object can be salvaged.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    snippet = text[start:]
+
+    for _ in range(8):
+        stack, in_string = _scan_json_state(snippet)
+        repaired = snippet + ('"' if in_string else '') + ''.join(reversed(stack))
+        try:
+            parsed = _loads(repaired)
+            if isinstance(parsed, dict):
+                return parsed
+        except ValueError:
+            pass
+        # Drop the trailing partial element and retry from the last comma
+        cut = snippet.rfind(',')
+        if cut <= 0:
+            return None
+        snippet = snippet[:cut]
+    return None
+
+
+# Co-Pilot prompts are constant apart from the running-context interpolation;
+# build the literals once at module load instead of reassembling the
+# multi-line f-strings on every analysis cycle.
+_COPILOT_FIRST_PROMPT = """This is the start of a conversation. Analyze the audio and provide:
+1. What was discussed
+2. Summary of the conversation
+3. Key points mentioned
+4. Any decisions made
+5. Action items identified
+6. Open questions raised
+7. Suggested questions to ask next (with reasons)
+8. Key concepts (technical terms, names, topics) with brief context
+
+Respond in JSON format with these exact fields:
+{"new_content": "...", "updated_summary": "...", "key_points": [...], "decisions": [...], "action_items": [...], "open_questions": [...], "suggested_questions": [{"question": "...", "reason": "..."}], "key_concepts": [{"term": "...", "context": "..."}]}"""
+
+_COPILOT_CONTEXT_PROMPT = """Previous conversation summary:
+{context}
+
+Analyze the new audio segment and provide:
+1. What new content was discussed
+2. Updated summary of the entire conversation so far
+3. Key points mentioned
+4. Any decisions made
+5. Action items identified
+6. Open questions raised
+7. Suggested questions to ask next (with reasons)
+8. Key concepts (technical terms, names, topics) with brief context
+
+Respond in JSON format with these exact fields:
+{{"new_content": "...", "updated_summary": "...", "key_points": [...], "decisions": [...], "action_items": [...], "open_questions": [...], "suggested_questions": [{{"question": "...", "reason": "..."}}], "key_concepts": [{{"term": "...", "context": "..."}}]}}"""
+
+
+# Token budget for the variable content slice in generate-tags/summarize;
+# bounds worst-case prefill FLOPs regardless of input entropy.
+_CONTENT_TOKEN_BUDGET = 512
+
+# tqdm ships with huggingface_hub; used to bridge snapshot_download progress
+# into NDJSON frames (see _NDJSONTqdm below).
+try:
+    from tqdm.auto import tqdm as _tqdm_base
+except ImportError:
+    _tqdm_base = None
+
+if _tqdm_base is not None:
+    class _NDJSONTqdm(_tqdm_base):
+        """tqdm subclass emitting NDJSON progress frames instead of a bar.
+
+        huggingface_hub drives this via the tqdm_class hook of
+        snapshot_download, so progress events are real (previously the
+        local progress_callback was never wired in and nothing was
+        emitted during downloads).
+        """
+
+        _last_progress = -1.0
+
+        def update(self, n=1):
+            displayed = super().update(n)
+            if self.total:
+                progress = round(self.n * (100.0 / self.total), 2)
+                # hf_transfer can drive update() hundreds of times per
+                # second; only emit when the rounded percentage actually
+                # moved, so the parent isn't flooded with identical frames
+                if progress != self._last_progress:
+                    self._last_progress = progress
+                    payload = {
+                        "type": "progress",
+                        "command": "download-model",
+                        "progress": progress,
+                    }
+                    # Byte-unit bars also report volume; file-count bars don't
+                    if self.unit == 'B':
+                        payload["downloaded_mb"] = round(self.n * (1.0 / (1024 * 1024)), 2)
+                    _emit(payload)
+            return displayed
+else:
+    _NDJSONTqdm = None
+
+# Used for the mlx-lm-omni version gate in apply_runtime_patches; guarded so
+# a missing packaging install degrades to patching rather than a crash.
 try:
-    from mlx_lm_omni import load as mlx_omni_load
-    from mlx_lm_omni import generate as mlx_omni_generate
-    OMNI_AVAILABLE = True
+    from packaging import version as _packaging_version
 except ImportError:
-    mlx_omni_load = None
-    mlx_omni_generate = None
-    OMNI_AVAILABLE = False
+    _packaging_version = None
+
+
+def _load_pcm(audio_path: str):
+    """Load raw PCM (s16le, 16kHz, mono); fromfile reads straight into the
+    int16 array, skipping the intermediate bytes object f.read() makes."""
+    pcm_data = np.fromfile(audio_path, dtype=np.int16)
+    return np.multiply(pcm_data, 1.0 / 32768.0, dtype=np.float32)
+
+
+def _load_soundfile(audio_path: str):
+    """Load any container soundfile can decode (wav, flac, ...).
+
+    Reads samples as int16 and converts to float32 in a single pass,
+    avoiding librosa's decode-to-float32 + CPU resample pipeline. Jarvis
+    captures audio at 16kHz mono, so the resample branch is rarely taken;
+    when it is, a polyphase filter runs directly on the int16 data.
+    """
+    if sf is None:
+        raise ImportError("soundfile is required for audio decoding")
+    data, sr = sf.read(audio_path, dtype='int16', always_2d=False)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if sr != 16000:
+        from scipy.signal import resample_poly
+        gcd = math.gcd(16000, sr)
+        data = resample_poly(data, 16000 // gcd, sr // gcd)
+    return np.multiply(data, 1.0 / 32768.0, dtype=np.float32)
+
+
+# Extension → loader dispatch: one splitext + dict lookup instead of a chain
+# of endswith checks, and adding a format is a table entry rather than a
+# new branch.
+_AUDIO_LOADERS = {
+    '.wav': _load_soundfile,
+    '.flac': _load_soundfile,
+    '.pcm': _load_pcm,
+}
+
+
+def _load_audio_fast(audio_path: str):
+    """Load an audio file as 16kHz mono float32 samples in [-1, 1]."""
+    loader = _AUDIO_LOADERS.get(os.path.splitext(audio_path)[1].lower())
+    if loader is None:
+        raise ValueError(f"Unsupported audio format: {audio_path}")
+    return loader(audio_path)
+
+
+# One-shot guard for apply_runtime_patches
+_PATCHES_APPLIED = False
 
 
 def apply_runtime_patches():
@@ -69,7 +430,7 @@ def apply_runtime_patches():
     
     These patches fix six critical bugs in mlx-lm-omni <= 0.1.3:
     1. AudioTower reshape bug (causes failure on audio > 15s) - RUNTIME PATCH
-    2. AudioMel precision loss (float16 → float32) - RUNTIME PATCH
+    2. AudioMel GPU log-mel front-end (CPU path kept as fallback) - RUNTIME PATCH
     3. ExtendedQuantizedEmbedding kwargs compatibility - RUNTIME PATCH
     4. Model attribute delegation to tokenizer - RUNTIME PATCH
     5. Prefill chunking bug (causes IndexError on audio > 30s) - CALL-SITE FIX (prefill_step_size=32768)
@@ -79,14 +440,21 @@ def apply_runtime_patches():
     Bug #5 is fixed at call-site in generate_transcript() via prefill_step_size parameter.
     
     Patches are version-gated and automatically disabled for versions > 0.1.3.
+    Re-invocation (e.g. on model reload) is a no-op: patching twice would
+    re-wrap the already-wrapped __call__/__init__ methods.
     """
+    global _PATCHES_APPLIED
+    if _PATCHES_APPLIED:
+        return
+    _PATCHES_APPLIED = True
+
     try:
         import mlx_lm_omni
-        from packaging import version
 
         # Only apply patches for versions <= 0.1.3
         omni_version = getattr(mlx_lm_omni, '__version__', '0.1.3')
-        if version.parse(omni_version) > version.parse("0.1.3"):
+        if (_packaging_version is not None
+                and _packaging_version.parse(omni_version) > _packaging_version.parse("0.1.3")):
             print(f"MLX: mlx-lm-omni version {omni_version} > 0.1.3, skipping patches",
                   file=sys.stderr, flush=True)
             return
@@ -100,29 +468,60 @@ def apply_runtime_patches():
         try:
             from mlx_lm_omni.models.qwen_omni.audio_tower import AudioTower
             import mlx.nn as nn
-            import math as _math
 
             def patched_audio_tower_call(self, audio_mel: mx.array) -> mx.array:
+                # The mel front-end emits float32 (log precision); cast back to
+                # the model's compute dtype on-device before the conv stack so
+                # the fp16 weights aren't promoted to fp32 matmuls.
+                if audio_mel.dtype != self.conv1.weight.dtype:
+                    audio_mel = audio_mel.astype(self.conv1.weight.dtype)
                 x_size = audio_mel.shape[1] // 2
                 if audio_mel.shape[1] % (self.n_window * 2) != 0:
                     last_chunk_size = audio_mel.shape[1] % (self.n_window * 2)
-                    audio_mel = mx.pad(audio_mel, pad_width=[(0, 0), (0, self.n_window * 2 - last_chunk_size)], mode="constant", constant_values=0)
+                    # Pad by concatenating a slice of a cached zero block:
+                    # mx.pad materializes a fresh zero-filled array (and full
+                    # copy of the mel) each call, while the cached source is
+                    # allocated once per tower and reused.
+                    pad_len = self.n_window * 2 - last_chunk_size
+                    zeros = getattr(self, '_pad_zeros', None)
+                    if (zeros is None or zeros.shape[0] != audio_mel.shape[0]
+                            or zeros.dtype != audio_mel.dtype):
+                        zeros = mx.zeros((audio_mel.shape[0], self.n_window * 2), dtype=audio_mel.dtype)
+                        self._pad_zeros = zeros
+                    audio_mel = mx.concatenate([audio_mel, zeros[:, :pad_len]], axis=1)
                 else:
                     last_chunk_size = self.n_window
 
-                chunks_count = _math.floor(audio_mel.shape[1] / (self.n_window * 2))
+                chunks_count = math.floor(audio_mel.shape[1] / (self.n_window * 2))
                 chunks = mx.reshape(audio_mel, (audio_mel.shape[0], chunks_count, self.n_window * 2))
                 chunks = mx.transpose(chunks, (1, 2, 0))
 
-                x = nn.gelu(self.conv1(chunks))
+                # Compiled conv+gelu(+pos-add) stages: fuses the elementwise ops
+                # and collapses the per-op Python→Metal dispatches into single
+                # graph launches. shapeless=True avoids a re-trace for every new
+                # chunk count (audio length). Built once per tower instance; the
+                # zero-masking between the stages stays eager because it only
+                # runs for a partial trailing chunk.
+                compiled = getattr(self, '_compiled_conv_stages', None)
+                if compiled is None:
+                    def _conv_stage1(chunks):
+                        return nn.gelu(self.conv1(chunks))
+
+                    def _conv_stage2(x, embed_pos):
+                        return nn.gelu(self.conv2(x)) + embed_pos
+
+                    compiled = (mx.compile(_conv_stage1, shapeless=True),
+                                mx.compile(_conv_stage2, shapeless=True))
+                    self._compiled_conv_stages = compiled
+                conv_stage1, conv_stage2 = compiled
+
+                x = conv_stage1(chunks)
 
                 if last_chunk_size != self.n_window:
                     x[chunks_count - 1, last_chunk_size:, :] = 0
 
-                x = nn.gelu(self.conv2(x))
-
-                embed_pos = mx.expand_dims(self._positional_embedding[:x.shape[1]], axis=0)
-                x = x + embed_pos
+                embed_pos = mx.expand_dims(self._positional_embedding[:x.shape[1] // 2], axis=0)
+                x = conv_stage2(x, embed_pos)
 
                 # Transformer: each chunk is a batch element → independent attention (correct!)
                 for block in self.layers:
@@ -141,20 +540,60 @@ def apply_runtime_patches():
         except Exception as e:
             print(f"MLX: Warning - failed to patch AudioTower: {e}", file=sys.stderr, flush=True)
 
-        # Patch 2: AudioMel - use float32 for precision (mel_filters is numpy, not MLX)
+        # Patch 2: AudioMel - compute the log-mel on the GPU
+        # The stock AudioMel runs a CPU FFT + numpy mel matmul per request and
+        # stages the resulting mel onto the device on every call. Replace it
+        # with an MLX-native front-end: STFT as two conv1d passes with
+        # precomputed windowed-DFT kernels, power spectrum, then a matmul
+        # against the mel filterbank held as an mx.array — one lazy graph in
+        # unified memory, no CPU FFT or per-call host→device mel transfer.
+        # Falls back to the original (float32-filter) path on any failure.
         try:
-            import numpy as np
             from mlx_lm_omni.audio_mel import AudioMel
-            original_init = AudioMel.__init__
+            original_mel_call = AudioMel.__call__
+
+            def patched_mel_call(self, audio):
+                try:
+                    n_fft = getattr(self, 'n_fft', 400)
+                    hop_length = getattr(self, 'hop_length', 160)
+
+                    # Kernels are built once per AudioMel and cached on the instance
+                    cached = getattr(self, '_gpu_mel_kernels', None)
+                    if cached is None:
+                        window = np.hanning(n_fft + 1)[:-1]
+                        n = np.arange(n_fft)
+                        k = np.arange(n_fft // 2 + 1)[:, None]
+                        angles = 2.0 * np.pi * k * n / n_fft
+                        # mx.conv1d weights: (out_channels, kernel_size, in_channels)
+                        kernel_real = mx.array((np.cos(angles) * window).astype(np.float32)[:, :, None])
+                        kernel_imag = mx.array((-np.sin(angles) * window).astype(np.float32)[:, :, None])
+                        # fp16 copy for the bandwidth-bound filterbank matmul;
+                        # self.mel_filters stays float32 for the CPU fallback
+                        filters = mx.array(np.asarray(self.mel_filters, dtype=np.float16))
+                        cached = (kernel_real, kernel_imag, filters)
+                        self._gpu_mel_kernels = cached
+                    kernel_real, kernel_imag, filters = cached
 
-            def patched_init(self, *args, **kwargs):
-                original_init(self, *args, **kwargs)
-                # Convert mel_filters from float16 to float32 for precision
-                if hasattr(self, 'mel_filters'):
-                    self.mel_filters = self.mel_filters.astype(np.float32)
+                    # Reflect-pad by n_fft//2 on both sides (matches whisper STFT framing)
+                    samples = np.pad(np.asarray(audio, dtype=np.float32), n_fft // 2, mode='reflect')
+                    x = mx.array(samples)[None, :, None]  # (1, T, 1)
 
-            AudioMel.__init__ = patched_init
-            patches_applied.append("AudioMel.float32")
+                    real = mx.conv1d(x, kernel_real, stride=hop_length)
+                    imag = mx.conv1d(x, kernel_imag, stride=hop_length)
+                    power = (real * real + imag * imag)[0, :-1, :]  # drop trailing frame
+
+                    # Half-precision filterbank matmul (bandwidth-bound), then
+                    # upcast only for the log accumulate where precision matters
+                    mel = mx.maximum(power.astype(mx.float16) @ filters.T, 1e-10)
+                    log_spec = mx.log10(mel.astype(mx.float32))
+                    log_spec = mx.maximum(log_spec, log_spec.max() - 8.0)
+                    log_spec = (log_spec + 4.0) / 4.0
+                    return mx.transpose(log_spec)  # (n_mels, frames)
+                except Exception:
+                    return original_mel_call(self, audio)
+
+            AudioMel.__call__ = patched_mel_call
+            patches_applied.append("AudioMel.gpu_mel")
         except Exception as e:
             print(f"MLX: Warning - failed to patch AudioMel: {e}", file=sys.stderr, flush=True)
         
@@ -186,9 +625,29 @@ def apply_runtime_patches():
                 return getattr(self._tokenizer, name)
             TokenizerWithAudio.__getattr__ = _twa_getattr
 
-            # Wrap encode to accept and ignore extra kwargs (e.g. add_special_tokens)
+            # Hot attributes get explicit non-data descriptors so lookups take
+            # the normal descriptor path instead of __getattr__'s
+            # raise-AttributeError-then-fallback sequence on every access.
+            # No __set__, so instance attributes are never shadowed.
+            class _DelegateToInner:
+                def __init__(self, name):
+                    self.name = name
+
+                def __get__(self, obj, objtype=None):
+                    if obj is None:
+                        return self
+                    return getattr(obj._tokenizer, self.name)
+
+            for _attr in ("chat_template", "get_vocab", "bos_token", "eos_token",
+                          "bos_token_id", "eos_token_id"):
+                if _attr not in TokenizerWithAudio.__dict__:
+                    setattr(TokenizerWithAudio, _attr, _DelegateToInner(_attr))
+
+            # Wrap encode to ignore the add_special_tokens kwarg that
+            # TokenizerWrapper forwards; an explicit parameter avoids the
+            # **kwargs dict allocation on every tokenization call.
             _original_encode = TokenizerWithAudio.encode
-            def _twa_encode(self, text, **kwargs):
+            def _twa_encode(self, text, add_special_tokens=None):
                 return _original_encode(self, text)
             TokenizerWithAudio.encode = _twa_encode
 
@@ -216,35 +675,80 @@ class MLXServer:
         self.model = None
         self.tokenizer = None
         self.model_name = None
+        self.param_count = None  # Computed once per loaded model
         self.capabilities = []  # Track model capabilities from catalog
-        
+        # Pre-tokenized constant prompt parts (populated in load_model)
+        self._tag_prefix_ids = None
+        self._tag_suffix_ids = None
+        self._sum_prefix_ids = None
+        self._sum_suffix_ids = None
+        # Per-task prompt KV caches keeping the static prefix warm
+        # (False marks a model whose cache doesn't support trimming)
+        self._task_caches = {}
+        # Chat KV cache reused across turns (see chat())
+        self._chat_cache = None
+        self._chat_fed_ids = []
+        # Small LRU of chat template encodings, keyed by the messages list
+        self._template_cache = OrderedDict()
+        # ExtendedEmbedding queue, resolved once per loaded audio model
+        self._embed_queue = None
+        # Memoized check-availability result (see check_availability)
+        self._availability = None
+        # Live download worker threads; run() joins them before exiting so
+        # EOF/shutdown can't kill a download mid-flight
+        self._download_threads = []
+        # Command dispatch table (see _build_handlers)
+        self._handlers = self._build_handlers()
+
     def check_availability(self) -> Dict[str, Any]:
-        """Check if MLX is available and working."""
+        """Check if MLX is available and working.
+
+        The smoketest runs once per process and the result is memoized, so
+        repeated availability pings don't dispatch an MLX kernel each time.
+        """
+        if self._availability is not None:
+            return self._availability
+
         try:
-            # Simple MLX operation to verify it works
-            _ = mx.array([1, 2, 3])
-            return {
+            # First call pays the deferred MLX import here, so the result
+            # also answers "can the stack be imported at all"
+            _ensure_mlx()
+            # Simple MLX operation to verify it works. mx.eval forces
+            # evaluation — MLX is lazy, so constructing the array alone
+            # would not actually exercise the backend.
+            mx.eval(mx.array([1, 2, 3]))
+            # Prewarm Metal: a tiny matmul makes the backend compile its
+            # shader pipeline now, not during the first generate call
+            mx.eval(mx.zeros((1, 1)) @ mx.zeros((1, 1)))
+            self._availability = {
                 "type": "response",
                 "command": "check-availability",
                 "available": True
             }
         except Exception as e:
-            return {
+            self._availability = {
                 "type": "response",
                 "command": "check-availability",
                 "available": False,
                 "error": str(e)
             }
+        return self._availability
     
-    def load_model(self, model_path: str, capabilities: Optional[List[str]] = None) -> Dict[str, Any]:
+    def load_model(self, model_path: str, capabilities: Optional[List[str]] = None,
+                   quantize: bool = False) -> Dict[str, Any]:
         """Load an MLX model from disk.
-        
+
         Args:
             model_path: Path to the model directory
             capabilities: List of capabilities from catalog (e.g., ["audio", "text"])
                          If not provided, defaults to ["text"] for backward compatibility
+            quantize: Quantize the loaded weights to 4-bit in place. Generation
+                      is memory-bound (every weight is streamed per token), so
+                      this roughly quarters per-token bandwidth for fp16 models.
+                      Ignored for models that already ship quantized.
         """
         try:
+            _ensure_mlx()
             # Store capabilities first so we know which loader to use
             # Default to ["text"] if not provided (backward compatibility)
             self.capabilities = capabilities if capabilities is not None else ["text"]
@@ -259,6 +763,8 @@ class MLXServer:
                         "command": "load-model",
                         "error": "mlx-lm-omni not installed. Install it to load multimodal models."
                     }
+                # Patch mlx-lm-omni before the first omni load (no-op after)
+                apply_runtime_patches()
                 self.model, self.tokenizer = mlx_omni_load(model_path)
 
                 # Fix conv weight layout after loading (7B weights ship in PyTorch layout)
@@ -274,11 +780,40 @@ class MLXServer:
                               file=sys.stderr, flush=True)
                 except Exception as e:
                     print(f"MLX: Conv weight check skipped: {e}", file=sys.stderr, flush=True)
+
+                # Resolve the ExtendedEmbedding queue once so the per-request
+                # clear is a single cached-reference call, not an attribute walk.
+                # Qwen-Omni structure: model.thinker.model.embed_tokens
+                embed = None
+                if hasattr(self.model, 'thinker') and hasattr(self.model.thinker, 'model'):
+                    embed = getattr(self.model.thinker.model, 'embed_tokens', None)
+                elif hasattr(self.model, 'language_model') and hasattr(self.model.language_model, 'model'):
+                    embed = getattr(self.model.language_model.model, 'embed_tokens', None)
+                self._embed_queue = getattr(embed, 'extended_embedding_queue', None) if embed else None
             else:
                 self.model, self.tokenizer = load(model_path)
+                self._embed_queue = None
+
+            if quantize:
+                self._maybe_quantize_model()
 
             self.model_name = model_path.split("/")[-1]
-            
+
+            # Estimate parameter count once at load time; model-info queries
+            # become an attribute read instead of a walk over every tensor
+            try:
+                self.param_count = sum(p.size for p in self.model.parameters())
+            except Exception:
+                self.param_count = None
+
+            self._cache_prompt_tokens()
+            # Any cached KV state or template encodings belong to the
+            # previous model/tokenizer
+            self._chat_cache = None
+            self._chat_fed_ids = []
+            self._template_cache.clear()
+            self._task_caches = {}
+
             return {
                 "type": "response",
                 "command": "load-model",
@@ -293,23 +828,135 @@ class MLXServer:
                 "error": str(e)
             }
     
+    def _maybe_quantize_model(self) -> None:
+        """Quantize the loaded model's linear layers to 4-bit in place.
+
+        No-op when the model is already quantized. Failures are logged and
+        the model is kept in its loaded precision — a slower model beats a
+        failed load.
+        """
+        import mlx.nn as nn
+        try:
+            modules = [m for _, m in self.model.named_modules()]
+            if any(isinstance(m, nn.QuantizedLinear) for m in modules):
+                return
+            nn.quantize(
+                self.model,
+                group_size=64,
+                bits=4,
+                # Only layers whose inner dim divides the group size can be
+                # quantized; mixed-precision models keep the rest as-is
+                class_predicate=lambda _, m: (
+                    isinstance(m, nn.Linear) and m.weight.shape[-1] % 64 == 0
+                ),
+            )
+            print("MLX: Quantized model to 4-bit (group_size=64)",
+                  file=sys.stderr, flush=True)
+        except Exception as e:
+            print(f"MLX: Quantization skipped: {e}", file=sys.stderr, flush=True)
+
+    def _cache_prompt_tokens(self) -> None:
+        """Pre-tokenize the constant parts of the generate-tags/summarize prompts.
+
+        The instruction preamble and trailing cue are identical on every call,
+        so tokenize them once per loaded tokenizer. Each request then only
+        tokenizes the variable content slice and concatenates token ids,
+        instead of re-tokenizing the full prompt string.
+        """
+        self._tag_prefix_ids = self.tokenizer.encode(
+            "Generate 3-5 relevant tags for this content. Return ONLY a JSON array of strings, nothing else.\n\nContent: "
+        )
+        self._tag_suffix_ids = self.tokenizer.encode("\n\nTags:", add_special_tokens=False)
+        self._sum_prefix_ids = self.tokenizer.encode(
+            "Summarize this content in 2-3 sentences. Be concise and factual.\n\nContent: "
+        )
+        self._sum_suffix_ids = self.tokenizer.encode("\n\nSummary:", add_special_tokens=False)
+
+    def _generate_with_prefix_cache(self, task: str, prefix_ids: List[int],
+                                    content_ids: List[int], suffix_ids: List[int],
+                                    max_tokens: int) -> str:
+        """Generate greedily with a per-task KV cache that keeps the static
+        instruction prefix prefilled.
+
+        First use prefills the whole prompt through the cache; after every
+        call the cache is trimmed back to the prefix, so subsequent requests
+        only prefill the variable content and suffix. Models whose caches
+        can't be trimmed fall back to plain cache-less generation.
+        """
+        cache = self._task_caches.get(task)
+        if cache is None:
+            cache = make_prompt_cache(self.model)
+            if not can_trim_prompt_cache(cache):
+                self._task_caches[task] = False
+                cache = False
+            else:
+                self._task_caches[task] = cache
+
+        if cache is False:
+            return mlx_lm_generate(
+                self.model,
+                self.tokenizer,
+                prompt=mx.array(prefix_ids + content_ids + suffix_ids),
+                max_tokens=max_tokens,
+                sampler=_GREEDY_SAMPLER,
+                verbose=False
+            )
+
+        offset = getattr(cache[0], 'offset', 0)
+        if offset == len(prefix_ids):
+            # Prefix already prefilled from a previous call
+            prompt_ids = content_ids + suffix_ids
+        else:
+            if offset:
+                trim_prompt_cache(cache, offset)
+            prompt_ids = prefix_ids + content_ids + suffix_ids
+
+        try:
+            response = mlx_lm_generate(
+                self.model,
+                self.tokenizer,
+                prompt=mx.array(prompt_ids),
+                max_tokens=max_tokens,
+                sampler=_GREEDY_SAMPLER,
+                prompt_cache=cache,
+                verbose=False
+            )
+        except Exception:
+            # Cache state is unknown after a failed generation; rebuild
+            self._task_caches.pop(task, None)
+            raise
+
+        # Trim the variable content and generated tokens, keeping the prefix
+        offset = getattr(cache[0], 'offset', 0)
+        if offset > len(prefix_ids):
+            trim_prompt_cache(cache, offset - len(prefix_ids))
+        return response
+
     def _parse_tags(self, response: str) -> List[str]:
         """Parse tags from model response, handling various output formats."""
         text = response.strip()
 
+        # Fast path: the model usually returns a clean JSON array, so try
+        # parsing the whole text before paying for a regex scan
+        try:
+            tags = _loads(text)
+            if isinstance(tags, list):
+                return [str(t).strip() for t in tags if str(t).strip()]
+        except ValueError:
+            pass
+
         # Try to extract a JSON array from the response (model may add extra text around it)
-        match = re.search(r'\[.*?\]', text, re.DOTALL)
+        match = _TAG_ARRAY_RE.search(text)
         if match:
             try:
-                tags = json.loads(match.group())
+                tags = _loads(match.group())
                 if isinstance(tags, list):
                     return [str(t).strip() for t in tags if str(t).strip()]
-            except json.JSONDecodeError:
+            except ValueError:
                 pass
 
-        # Fallback: strip brackets, split by commas
-        text = text.strip('[]')
-        tags = [t.strip().strip('"\'') for t in text.replace('\n', ',').split(',')]
+        # Fallback: one translate pass over the whole text, one comma split
+        tags = (t.strip() for t in text.translate(_TAG_CLEAN_TABLE).split(','))
         return [t for t in tags if t]
 
     def generate_tags(self, content: str) -> Dict[str, Any]:
@@ -322,19 +969,15 @@ class MLXServer:
             }
         
         try:
-            prompt = f"""Generate 3-5 relevant tags for this content. Return ONLY a JSON array of strings, nothing else.
-
-Content: {content[:2000]}
-
-Tags:"""
-            
-            # Append /no_think suffix to model name for faster inference
-            response = mlx_lm_generate(
-                self.model,
-                self.tokenizer,
-                prompt=prompt,
-                max_tokens=200,
-                verbose=False
+            # Constant prompt parts are pre-tokenized in load_model; only the
+            # content slice is tokenized per call, truncated at the token
+            # level — a character slice gives wildly varying prefill budgets
+            # (CJK/code content can be several tokens per character)
+            content_ids = self.tokenizer.encode(
+                content[:8000], add_special_tokens=False)[:_CONTENT_TOKEN_BUDGET]
+            response = self._generate_with_prefix_cache(
+                "tags", self._tag_prefix_ids, content_ids, self._tag_suffix_ids,
+                max_tokens=200
             )
             
             # Parse the response as JSON array
@@ -362,19 +1005,14 @@ Tags:"""
             }
         
         try:
-            prompt = f"""Summarize this content in 2-3 sentences. Be concise and factual.
-
-Content: {content[:2000]}
-
-Summary:"""
-            
-            # Append /no_think suffix to model name for faster inference
-            response = mlx_lm_generate(
-                self.model,
-                self.tokenizer,
-                prompt=prompt,
-                max_tokens=150,
-                verbose=False
+            # Constant prompt parts are pre-tokenized in load_model; only the
+            # content slice is tokenized per call, truncated at the token
+            # level (see generate_tags)
+            content_ids = self.tokenizer.encode(
+                content[:8000], add_special_tokens=False)[:_CONTENT_TOKEN_BUDGET]
+            response = self._generate_with_prefix_cache(
+                "summarize", self._sum_prefix_ids, content_ids, self._sum_suffix_ids,
+                max_tokens=150
             )
             
             summary = response.strip()
@@ -415,16 +1053,47 @@ Summary:"""
             }
         
         try:
-            from mlx_lm.sample_utils import make_logits_processors, make_sampler
+            # Memoize template encodings: UI retries and resubmits send an
+            # identical messages list, so skip re-templating those
+            cache_key = tuple((m["role"], m["content"]) for m in messages)
+            token_ids = self._template_cache.get(cache_key)
+            if token_ids is None:
+                # Build conversation from messages array, apply chat template
+                conversation = [{"role": m["role"], "content": m["content"]} for m in messages]
+                token_ids = self.tokenizer.apply_chat_template(
+                    conversation,
+                    add_generation_prompt=True
+                )
+                self._template_cache[cache_key] = token_ids
+                if len(self._template_cache) > 16:
+                    self._template_cache.popitem(last=False)
+            else:
+                self._template_cache.move_to_end(cache_key)
 
-            # Build conversation from messages array
-            conversation = [{"role": m["role"], "content": m["content"]} for m in messages]
+            # Reuse the KV cache across turns. A follow-up turn re-sends the
+            # whole history, whose template token ids share a prefix with what
+            # was prefilled last turn — trim the cache back to that shared
+            # prefix and prefill only the new suffix, so turn-N prefill cost
+            # is O(new tokens) instead of O(entire conversation).
+            prompt_ids = token_ids
+            if self._chat_cache is not None and self._chat_fed_ids:
+                common = 0
+                max_common = min(len(self._chat_fed_ids), len(token_ids) - 1)
+                while common < max_common and self._chat_fed_ids[common] == token_ids[common]:
+                    common += 1
 
-            # Apply chat template and generate
-            token_ids = self.tokenizer.apply_chat_template(
-                conversation,
-                add_generation_prompt=True
-            )
+                cache_len = getattr(self._chat_cache[0], 'offset', None)
+                if (common > 0 and cache_len is not None and cache_len >= common
+                        and can_trim_prompt_cache(self._chat_cache)):
+                    # Cache also holds last turn's generated tokens; drop
+                    # everything past the shared prefix.
+                    trim_prompt_cache(self._chat_cache, cache_len - common)
+                    prompt_ids = token_ids[common:]
+                else:
+                    self._chat_cache = None
+
+            if self._chat_cache is None:
+                self._chat_cache = make_prompt_cache(self.model)
 
             # Repetition penalty prevents degenerate looping responses
             logits_processors = make_logits_processors(
@@ -436,12 +1105,14 @@ Summary:"""
             response_text = mlx_lm_generate(
                 self.model,
                 self.tokenizer,
-                prompt=token_ids,
+                prompt=mx.array(prompt_ids),
                 max_tokens=512,
                 logits_processors=logits_processors,
                 sampler=sampler,
+                prompt_cache=self._chat_cache,
                 verbose=False
             )
+            self._chat_fed_ids = list(token_ids)
 
             return {
                 "type": "response",
@@ -449,6 +1120,9 @@ Summary:"""
                 "response": response_text.strip()
             }
         except Exception as e:
+            # The cache may hold a partially-prefilled state; drop it
+            self._chat_cache = None
+            self._chat_fed_ids = []
             return {
                 "type": "error",
                 "command": "chat",
@@ -488,10 +1162,6 @@ Summary:"""
             }
         
         try:
-            import librosa
-            import numpy as np
-            import os
-            
             # Check if file exists
             if not os.path.exists(audio_path):
                 return {
@@ -501,19 +1171,14 @@ Summary:"""
                 }
             
             # Load audio file
-            if audio_path.endswith('.wav'):
-                audio, sr = librosa.load(audio_path, sr=16000, mono=True)
-            elif audio_path.endswith('.pcm'):
-                # Read raw PCM (s16le, 16kHz, mono)
-                with open(audio_path, 'rb') as f:
-                    pcm_data = np.frombuffer(f.read(), dtype=np.int16)
-                audio = pcm_data.astype(np.float32) / 32768.0  # Convert to float32 [-1, 1]
-            else:
+            loader = _AUDIO_LOADERS.get(os.path.splitext(audio_path)[1].lower())
+            if loader is None:
                 return {
                     "type": "error",
                     "command": "generate-transcript",
                     "error": f"Unsupported audio format: {audio_path}"
                 }
+            audio = loader(audio_path)
             
             # Handle empty audio
             if len(audio) == 0:
@@ -524,15 +1189,10 @@ Summary:"""
                     "transcript": ""
                 }
             
-            # Clear ExtendedEmbedding queue to prevent state leakage between calls.
-            # Qwen-Omni structure: model.thinker.model.embed_tokens
-            embed = None
-            if hasattr(self.model, 'thinker') and hasattr(self.model.thinker, 'model'):
-                embed = getattr(self.model.thinker.model, 'embed_tokens', None)
-            elif hasattr(self.model, 'language_model') and hasattr(self.model.language_model, 'model'):
-                embed = getattr(self.model.language_model.model, 'embed_tokens', None)
-            if embed and hasattr(embed, 'extended_embedding_queue'):
-                embed.extended_embedding_queue.clear()
+            # Clear ExtendedEmbedding queue to prevent state leakage between
+            # calls; the reference was resolved once in load_model
+            if self._embed_queue is not None:
+                self._embed_queue.clear()
             
             # Generate transcript — structured JSON output with language detection
             prompt_text = 'Detect the language spoken. Transcribe word for word in the detected language. Do NOT translate. Respond in JSON: {"language": "...", "transcript": "..."}'
@@ -546,30 +1206,56 @@ Summary:"""
             ]
             token_ids = self.tokenizer.apply_chat_template(messages, add_generation_prompt=True)
 
-            response = mlx_lm_generate(
+            # Stream generation so the host-side scan below overlaps with GPU
+            # decode, and stop as soon as the top-level JSON object closes —
+            # otherwise the model may keep generating up to max_tokens.
+            # Incremental version of the _scan_json_state logic: braces only
+            # count outside string values, so a transcript containing literal
+            # { or } (dictated code, emoticons) can't trigger a false stop.
+            pieces = []
+            brace_depth = 0
+            seen_brace = False
+            in_string = False
+            escape = False
+            done = False
+            for segment in mlx_lm_stream_generate(
                 self.model,
                 self.tokenizer,
                 prompt=token_ids,
                 max_tokens=2000,
                 prefill_step_size=32768,
-                verbose=False
-            )
+            ):
+                pieces.append(segment.text)
+                for ch in segment.text:
+                    if escape:
+                        escape = False
+                    elif in_string:
+                        if ch == '\\':
+                            escape = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = True
+                    elif ch == '{':
+                        brace_depth += 1
+                        seen_brace = True
+                    elif ch == '}':
+                        brace_depth -= 1
+                        if seen_brace and brace_depth <= 0:
+                            done = True
+                            break
+                if done:
+                    break
+            response = "".join(pieces)
 
             # Parse structured JSON response from model
-            import json as _json
-            response_text = response.strip()
-            # Strip markdown code fence if present
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                # Remove first line (```json) and last line (```)
-                lines = [l for l in lines if not l.strip().startswith("```")]
-                response_text = "\n".join(lines).strip()
+            response_text = _strip_code_fence(response.strip())
 
             try:
-                parsed = _json.loads(response_text)
+                parsed = _loads(response_text)
                 language = parsed.get("language", "unknown")
                 transcript = parsed.get("transcript", response_text)
-            except _json.JSONDecodeError:
+            except ValueError:
                 # Fallback: use raw response as transcript
                 transcript = response_text
                 language = "unknown"
@@ -594,13 +1280,16 @@ Summary:"""
                 "error": f"Transcription failed: {str(e)}"
             }
     
-    def copilot_analyze(self, audio_path: str, context: str) -> Dict[str, Any]:
-        """Analyze audio chunk with running context for Co-Pilot.
-        
+    def copilot_analyze(self, audio_path: str, context: str,
+                        audio_paths: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Analyze audio chunk(s) with running context for Co-Pilot.
+
         Args:
             audio_path: Path to audio file (.wav format)
             context: Running context (previous cycle's summary, empty for first cycle)
-            
+            audio_paths: Optional list of chunk paths; consecutive rolling
+                         windows are analyzed together in a single call
+
         Returns:
             Dict with type, command, and structured analysis fields
         """
@@ -628,21 +1317,26 @@ Summary:"""
             }
         
         try:
-            import librosa
-            import numpy as np
-            import os
-            import json as _json
-            
-            # Check if file exists
-            if not os.path.exists(audio_path):
-                return {
-                    "type": "error",
-                    "command": "copilot-analyze",
-                    "error": f"Audio file not found: {audio_path}"
-                }
-            
-            # Load audio file
-            audio, sr = librosa.load(audio_path, sr=16000, mono=True)
+            paths = audio_paths if audio_paths else [audio_path]
+
+            # Check if files exist
+            for path in paths:
+                if not os.path.exists(path):
+                    return {
+                        "type": "error",
+                        "command": "copilot-analyze",
+                        "error": f"Audio file not found: {path}"
+                    }
+
+            # Load audio. Pending rolling windows are consecutive slices of
+            # one capture stream, so concatenating them costs a single
+            # generate call (one KV-cache setup, one audio-tower pass — the
+            # patched tower already batches along the chunk dimension)
+            # instead of one full inference per window.
+            if len(paths) == 1:
+                audio = _load_audio_fast(paths[0])
+            else:
+                audio = np.concatenate([_load_audio_fast(path) for path in paths])
             
             # Handle empty audio
             if len(audio) == 0:
@@ -660,41 +1354,14 @@ Summary:"""
                 }
             
             # Clear ExtendedEmbedding queue to prevent state leakage
-            if hasattr(self.model, 'language_model') and hasattr(self.model.language_model, 'model'):
-                embed = self.model.language_model.model.embed_tokens
-                if hasattr(embed, 'extended_embedding_queue'):
-                    embed.extended_embedding_queue.clear()
+            if self._embed_queue is not None:
+                self._embed_queue.clear()
             
             # Construct prompt based on whether this is first cycle or subsequent
             if context:
-                prompt_text = f"""Previous conversation summary:
-{context}
-
-Analyze the new audio segment and provide:
-1. What new content was discussed
-2. Updated summary of the entire conversation so far
-3. Key points mentioned
-4. Any decisions made
-5. Action items identified
-6. Open questions raised
-7. Suggested questions to ask next (with reasons)
-8. Key concepts (technical terms, names, topics) with brief context
-
-Respond in JSON format with these exact fields:
-{{"new_content": "...", "updated_summary": "...", "key_points": [...], "decisions": [...], "action_items": [...], "open_questions": [...], "suggested_questions": [{{"question": "...", "reason": "..."}}], "key_concepts": [{{"term": "...", "context": "..."}}]}}"""
+                prompt_text = _COPILOT_CONTEXT_PROMPT.format(context=context)
             else:
-                prompt_text = """This is the start of a conversation. Analyze the audio and provide:
-1. What was discussed
-2. Summary of the conversation
-3. Key points mentioned
-4. Any decisions made
-5. Action items identified
-6. Open questions raised
-7. Suggested questions to ask next (with reasons)
-8. Key concepts (technical terms, names, topics) with brief context
-
-Respond in JSON format with these exact fields:
-{"new_content": "...", "updated_summary": "...", "key_points": [...], "decisions": [...], "action_items": [...], "open_questions": [...], "suggested_questions": [{"question": "...", "reason": "..."}], "key_concepts": [{"term": "...", "context": "..."}]}"""
+                prompt_text = _COPILOT_FIRST_PROMPT
             
             # Build messages with audio
             messages = [
@@ -713,19 +1380,21 @@ Respond in JSON format with these exact fields:
             )
             
             # Parse JSON response
-            response_text = response.strip()
-            
-            # Strip markdown code fence if present
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                lines = [l for l in lines if not l.strip().startswith("```")]
-                response_text = "\n".join(lines).strip()
+            response_text = _strip_code_fence(response.strip())
             
             try:
-                parsed = _json.loads(response_text)
-                
+                parsed = _loads(response_text)
+                if not isinstance(parsed, dict):
+                    parsed = None
+            except ValueError:
+                # Truncated output (e.g. max_tokens hit mid-array): salvage
+                # the fields that did complete instead of burning a second
+                # generate call — re-generation costs seconds of GPU time
+                parsed = _complete_partial_json(response_text)
+
+            if parsed is not None:
                 # Validate required fields, provide defaults for missing (graceful parsing)
-                result = {
+                return {
                     "type": "response",
                     "command": "copilot-analyze",
                     "new_content": parsed.get("new_content", ""),
@@ -737,23 +1406,20 @@ Respond in JSON format with these exact fields:
                     "suggested_questions": parsed.get("suggested_questions", []),
                     "key_concepts": parsed.get("key_concepts", [])
                 }
-                
-                return result
-                
-            except _json.JSONDecodeError:
-                # Partial JSON - return what we can parse with defaults
-                return {
-                    "type": "response",
-                    "command": "copilot-analyze",
-                    "new_content": response_text,
-                    "updated_summary": response_text,
-                    "key_points": [],
-                    "decisions": [],
-                    "action_items": [],
-                    "open_questions": [],
-                    "suggested_questions": [],
-                    "key_concepts": []
-                }
+
+            # Nothing parseable - return the raw text with defaults
+            return {
+                "type": "response",
+                "command": "copilot-analyze",
+                "new_content": response_text,
+                "updated_summary": response_text,
+                "key_points": [],
+                "decisions": [],
+                "action_items": [],
+                "open_questions": [],
+                "suggested_questions": [],
+                "key_concepts": []
+            }
         
         except ImportError as e:
             return {
@@ -769,42 +1435,66 @@ Respond in JSON format with these exact fields:
             }
     
     def download_model(self, repo_id: str, destination: str) -> None:
-        """Download a model from HuggingFace Hub with progress reporting."""
+        """Download a model from HuggingFace Hub with progress reporting.
+
+        Runs in a daemon worker thread so the NDJSON event loop stays
+        responsive (check-availability, shutdown, ...) during multi-GB
+        downloads. Progress, completion, and error frames are emitted from
+        the worker; the _emit lock keeps them from interleaving with
+        main-loop responses. The parent may close stdin right after sending
+        this command and wait for the completion frame, so run() joins these
+        threads on EOF/shutdown instead of letting interpreter exit kill
+        them.
+        """
+        self._download_threads = [t for t in self._download_threads if t.is_alive()]
+        thread = threading.Thread(
+            target=self._download_model_worker,
+            args=(repo_id, destination),
+            daemon=True,
+        )
+        self._download_threads.append(thread)
+        thread.start()
+
+    def _download_model_worker(self, repo_id: str, destination: str) -> None:
         try:
-            def progress_callback(progress_info):
-                # Emit progress updates
-                if hasattr(progress_info, 'downloaded') and hasattr(progress_info, 'total'):
-                    percentage = (progress_info.downloaded / progress_info.total) * 100
-                    downloaded_mb = progress_info.downloaded / (1024 * 1024)
-                    
-                    print(json.dumps({
-                        "type": "progress",
-                        "command": "download-model",
-                        "progress": round(percentage, 2),
-                        "downloaded_mb": round(downloaded_mb, 2)
-                    }), file=sys.stdout, flush=True)
-            
-            # Download the model
+            _ensure_hub()
+            kwargs = {}
+            if _NDJSONTqdm is not None:
+                # Real progress: huggingface_hub drives the tqdm_class hook
+                kwargs["tqdm_class"] = _NDJSONTqdm
+
+            # Download the model. Symlinking into the HF cache avoids
+            # duplicating every blob into the destination (doubled disk and
+            # write bandwidth); mlx-lm follows symlinks when loading.
+            # Parallel workers overlap HTTP for multi-shard repos. Skip the
+            # known non-MLX weight duplicates by denylist rather than
+            # allowlisting: repos vary in what the tokenizer needs
+            # (merges.txt/vocab.txt, *.tiktoken, chat_template.jinja, ...)
+            # and a missed file only surfaces later as a load-model failure.
             snapshot_download(
                 repo_id=repo_id,
                 local_dir=destination,
-                local_dir_use_symlinks=False
+                local_dir_use_symlinks=True,
+                max_workers=8,
+                ignore_patterns=["*.bin", "*.pth", "*.pt", "*.gguf", "*.onnx",
+                                 "*.h5", "*.msgpack"],
+                **kwargs
             )
             
             # Emit completion
-            print(json.dumps({
+            _emit({
                 "type": "response",
                 "command": "download-model",
                 "success": True,
                 "destination": destination
-            }), file=sys.stdout, flush=True)
-            
+            })
+
         except Exception as e:
-            print(json.dumps({
+            _emit({
                 "type": "error",
                 "command": "download-model",
                 "error": str(e)
-            }), file=sys.stdout, flush=True)
+            })
     
     def model_info(self) -> Dict[str, Any]:
         """Get information about the loaded model."""
@@ -816,14 +1506,15 @@ Respond in JSON format with these exact fields:
             }
         
         try:
-            # Estimate parameter count (rough approximation)
-            param_count = sum(p.size for p in self.model.parameters())
-            
+            # Parameter count is cached at load time (rough approximation)
+            if self.param_count is None:
+                self.param_count = sum(p.size for p in self.model.parameters())
+
             return {
                 "type": "response",
                 "command": "model-info",
                 "model_name": self.model_name,
-                "param_count": param_count
+                "param_count": self.param_count
             }
         except Exception as e:
             return {
@@ -832,103 +1523,170 @@ Respond in JSON format with these exact fields:
                 "error": str(e)
             }
     
+    def _build_handlers(self) -> Dict[str, Any]:
+        """Build the command dispatch table once at startup.
+
+        Each handler validates its own required fields; handle_command then
+        reduces to a single dict lookup instead of a linear if/elif scan
+        over every command string.
+        """
+        def _missing(command: str, field: str) -> Dict[str, Any]:
+            return {"type": "error", "command": command, "error": f"Missing {field}"}
+
+        def load_model(d):
+            if not d.get("model_path"):
+                return _missing("load-model", "model_path")
+            return self.load_model(d["model_path"], d.get("capabilities"),
+                                   d.get("quantize", False))
+
+        def generate_tags(d):
+            if not d.get("content"):
+                return _missing("generate-tags", "content")
+            return self.generate_tags(d["content"])
+
+        def summarize(d):
+            if not d.get("content"):
+                return _missing("summarize", "content")
+            return self.summarize(d["content"])
+
+        def chat(d):
+            if not d.get("messages"):
+                return _missing("chat", "messages")
+            return self.chat(d["messages"])
+
+        def generate_transcript(d):
+            if not d.get("audio_path"):
+                return _missing("generate-transcript", "audio_path")
+            return self.generate_transcript(d["audio_path"])
+
+        def copilot_analyze(d):
+            audio_path = d.get("audio_path")
+            audio_paths = d.get("audio_paths")  # Optional chunk batch
+            if not audio_path and not audio_paths:
+                return _missing("copilot-analyze", "audio_path")
+            return self.copilot_analyze(audio_path, d.get("context", ""), audio_paths)
+
+        def download_model(d):
+            if not d.get("repo_id") or not d.get("destination"):
+                return _missing("download-model", "repo_id or destination")
+            # Download runs in a worker thread and emits its own responses
+            self.download_model(d["repo_id"], d["destination"])
+            return None  # Worker emits progress/completion frames
+
+        return {
+            "check-availability": lambda d: self.check_availability(),
+            "load-model": load_model,
+            "generate-tags": generate_tags,
+            "summarize": summarize,
+            "chat": chat,
+            "generate-transcript": generate_transcript,
+            "copilot-analyze": copilot_analyze,
+            "download-model": download_model,
+            "model-info": lambda d: self.model_info(),
+            "shutdown": lambda d: {"type": "response", "command": "shutdown",
+                                   "success": True},
+        }
+
     def handle_command(self, command_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Route commands to appropriate handlers."""
+        """Route commands through the dispatch table."""
         command = command_data.get("command")
-        
-        if command == "check-availability":
-            return self.check_availability()
-        
-        elif command == "load-model":
-            model_path = command_data.get("model_path")
-            capabilities = command_data.get("capabilities")  # Get capabilities from Rust
-            if not model_path:
-                return {"type": "error", "command": command, "error": "Missing model_path"}
-            return self.load_model(model_path, capabilities)
-        
-        elif command == "generate-tags":
-            content = command_data.get("content")
-            if not content:
-                return {"type": "error", "command": command, "error": "Missing content"}
-            return self.generate_tags(content)
-        
-        elif command == "summarize":
-            content = command_data.get("content")
-            if not content:
-                return {"type": "error", "command": command, "error": "Missing content"}
-            return self.summarize(content)
-        
-        elif command == "chat":
-            messages = command_data.get("messages")
-            if not messages:
-                return {"type": "error", "command": command, "error": "Missing messages"}
-            return self.chat(messages)
-        
-        elif command == "generate-transcript":
-            audio_path = command_data.get("audio_path")
-            if not audio_path:
-                return {"type": "error", "command": command, "error": "Missing audio_path"}
-            return self.generate_transcript(audio_path)
-        
-        elif command == "copilot-analyze":
-            audio_path = command_data.get("audio_path")
-            context = command_data.get("context", "")
-            if not audio_path:
-                return {"type": "error", "command": command, "error": "Missing audio_path"}
-            return self.copilot_analyze(audio_path, context)
-        
-        elif command == "download-model":
-            repo_id = command_data.get("repo_id")
-            destination = command_data.get("destination")
-            if not repo_id or not destination:
-                return {"type": "error", "command": command, "error": "Missing repo_id or destination"}
-            # Download runs synchronously and emits its own responses
-            self.download_model(repo_id, destination)
-            return None  # Already emitted response
-        
-        elif command == "model-info":
-            return self.model_info()
-        
-        elif command == "shutdown":
-            return {"type": "response", "command": "shutdown", "success": True}
-        
-        else:
+        handler = self._handlers.get(command)
+        if handler is None:
             return {"type": "error", "error": f"Unknown command: {command}"}
+        return handler(command_data)
     
+    # Commands cheap enough to answer directly on the I/O loop; everything
+    # else (generation, model loading) runs on the model worker thread
+    _INLINE_COMMANDS = frozenset({"check-availability", "model-info", "download-model"})
+
+    def _dispatch(self, command_data: Dict[str, Any]) -> None:
+        """Handle one command and emit its response (runs on either thread)."""
+        try:
+            response = self.handle_command(command_data)
+            if response:
+                _emit(response)
+        except Exception as e:
+            _emit({
+                "type": "error",
+                "error": f"Unexpected error: {str(e)}",
+                "traceback": traceback.format_exc()
+            })
+
     def run(self):
-        """Main event loop: read NDJSON from stdin, write to stdout."""
-        for line in sys.stdin:
-            line = line.strip()
-            if not line:
-                continue
-            
-            try:
-                command_data = json.loads(line)
-                response = self.handle_command(command_data)
-                
-                if response:
-                    print(json.dumps(response), file=sys.stdout, flush=True)
-                
-                # Exit on shutdown command
-                if command_data.get("command") == "shutdown":
-                    break
-                    
-            except json.JSONDecodeError as e:
-                print(json.dumps({
-                    "type": "error",
-                    "error": f"Invalid JSON: {str(e)}"
-                }), file=sys.stdout, flush=True)
-            except Exception as e:
-                print(json.dumps({
-                    "type": "error",
-                    "error": f"Unexpected error: {str(e)}",
-                    "traceback": traceback.format_exc()
-                }), file=sys.stdout, flush=True)
+        """Main event loop: read NDJSON from stdin, write to stdout.
+
+        Reads the raw byte stream in large chunks and splits frames on
+        newlines manually. Iterating text-mode sys.stdin pays incremental
+        UTF-8 decode and universal-newline translation per line; _loads
+        accepts the raw bytes directly.
+
+        Long-running commands execute on a single-worker executor that owns
+        the model, so lightweight commands (check-availability, model-info,
+        shutdown) are answered while a generation is in flight instead of
+        queueing behind it. The single worker keeps generation commands
+        strictly ordered; the _emit lock serializes response frames.
+        """
+        stdin_fd = sys.stdin.fileno()
+        selector = selectors.DefaultSelector()
+        selector.register(sys.stdin, selectors.EVENT_READ)
+        executor = ThreadPoolExecutor(max_workers=1)
+        buffer = bytearray()
+        shutdown = False
+
+        try:
+            while not shutdown:
+                if not selector.select():
+                    continue
+
+                # Reading the fd directly avoids double-buffering; the
+                # selector guarantees this won't block
+                chunk = os.read(stdin_fd, 65536)
+                if not chunk:
+                    break  # EOF
+
+                buffer += chunk
+                if b"\n" not in chunk:
+                    continue
+
+                *lines, remainder = buffer.split(b"\n")
+                buffer = bytearray(remainder)
+
+                for line in lines:
+                    line = line.strip()
+                    if not line:
+                        continue
+
+                    try:
+                        command_data = _loads(line)
+                    except ValueError as e:
+                        _emit({
+                            "type": "error",
+                            "error": f"Invalid JSON: {str(e)}"
+                        })
+                        continue
+
+                    command = command_data.get("command")
+                    if command == "shutdown":
+                        shutdown = True
+                        break
+                    if command in self._INLINE_COMMANDS:
+                        self._dispatch(command_data)
+                    else:
+                        executor.submit(self._dispatch, command_data)
+        finally:
+            # Drain any in-flight generation before acknowledging shutdown
+            executor.shutdown(wait=True)
+            # Downloads run on their own threads, not the executor; wait for
+            # their completion/error frames before letting the process exit
+            for thread in self._download_threads:
+                thread.join()
+            selector.close()
+            if shutdown:
+                _emit({"type": "response", "command": "shutdown", "success": True})
 
 
 if __name__ == "__main__":
-    # Apply runtime patches for mlx-lm-omni before starting server
-    apply_runtime_patches()
-    
+    # mlx-lm-omni runtime patches are applied lazily by load_model, right
+    # before the first omni load — startup stays import-free.
     server = MLXServer()
     server.run()